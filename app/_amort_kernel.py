@@ -0,0 +1,125 @@
+"""
+app/_amort_kernel.py
+
+Shared amortisation kernel used by app.metrics and app.reporting.
+- payment(loan, monthly_rate, n): level monthly payment (PMT)
+- schedule(loan, monthly_rate, n): (payment, interest, principal, balance) float64 arrays
+- schedule_head(loan, monthly_rate, n, rows): the same arrays for the first `rows` months only
+
+With numba installed the monthly recurrence is JIT-compiled (cached on disk);
+without it the closed-form NumPy version is used instead.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:  # numba is optional
+    njit = None
+    HAVE_NUMBA = False
+
+
+def _payment(loan, monthly_rate, n):
+    """
+    Level monthly payment repaying `loan` over n months; loan / n at 0%.
+    """
+    if monthly_rate == 0.0:
+        return loan / n
+    return loan * monthly_rate / (1.0 - (1.0 + monthly_rate) ** (-n))
+
+
+def _schedule_zero_rate(loan, n):
+    """
+    0% loan: level principal, no interest, balance falls linearly to zero.
+    """
+    pmt = loan / n
+    balance = np.linspace(loan - pmt, 0.0, n)
+    interest = np.zeros(n)
+    payment = np.full(n, pmt)
+    # Final month settles whatever balance is left
+    payment[-1] = balance[-2] if n > 1 else loan
+    principal = payment.copy()
+    return payment, interest, principal, balance
+
+
+def _schedule_numpy(loan, monthly_rate, n):
+    """
+    Closed-form schedule: balance after month m is P(1+r)^m - pmt((1+r)^m - 1)/r.
+    """
+    if monthly_rate == 0.0:
+        return _schedule_zero_rate(loan, n)
+    m = np.arange(1, n + 1)
+    pmt = _payment(loan, monthly_rate, n)
+    factor = (1.0 + monthly_rate) ** m
+    balance = loan * factor - pmt * (factor - 1.0) / monthly_rate
+    balance = np.maximum(balance, 0.0)
+    opening = np.concatenate(([loan], balance[:-1]))
+    interest = opening * monthly_rate
+    principal = pmt - interest
+    payment = np.full(n, pmt, dtype=np.float64)
+    # Final month settles whatever balance is left
+    principal[-1] = opening[-1]
+    payment[-1] = interest[-1] + principal[-1]
+    balance[-1] = 0.0
+    return payment, interest, principal, balance
+
+
+def _schedule_loop(loan, monthly_rate, n):
+    """
+    Month-by-month recurrence over preallocated arrays; compiled by numba.
+    """
+    if monthly_rate == 0.0:
+        return _schedule_zero_rate(loan, n)
+    payment = np.empty(n)
+    interest = np.empty(n)
+    principal = np.empty(n)
+    balance = np.empty(n)
+    pmt = _payment(loan, monthly_rate, n)
+    b = loan
+    for i in range(n):
+        intr = b * monthly_rate
+        prin = pmt - intr
+        # guard final payment rounding
+        if i == n - 1:
+            prin = b
+            payment[i] = intr + prin
+            b = 0.0
+        else:
+            payment[i] = pmt
+            b = max(b - prin, 0.0)
+        interest[i] = intr
+        principal[i] = prin
+        balance[i] = b
+    return payment, interest, principal, balance
+
+
+if HAVE_NUMBA:
+    # Rebound before the schedule kernel compiles, so it calls the compiled versions
+    payment = _payment = njit(cache=True)(_payment)
+    _schedule_zero_rate = njit(cache=True)(_schedule_zero_rate)
+    schedule = njit(cache=True, fastmath=True)(_schedule_loop)
+    # Compile (or load from numba's on-disk cache) at import so the first schedule doesn't pay for it
+    schedule(1.0, 0.01, 1)
+    schedule(1.0, 0.0, 1)
+else:
+    payment = _payment
+    schedule = _schedule_numpy
+
+
+def schedule_head(loan, monthly_rate, n, rows=12):
+    """
+    First `rows` months of an n-month schedule from the closed form, without building the rest.
+    Falls back to the full schedule when the term is no longer than `rows`.
+    """
+    if n <= rows:
+        return schedule(loan, monthly_rate, n)
+    m = np.arange(1, rows + 1)
+    pmt = payment(loan, monthly_rate, n)
+    if monthly_rate == 0.0:
+        balance = loan - pmt * m
+    else:
+        factor = (1.0 + monthly_rate) ** m
+        balance = loan * factor - pmt * (factor - 1.0) / monthly_rate
+    opening = np.concatenate(([loan], balance[:-1]))
+    interest = opening * monthly_rate
+    return np.full(rows, pmt), interest, pmt - interest, balance
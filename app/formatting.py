@@ -0,0 +1,67 @@
+"""
+app/formatting.py
+
+Display formatting helpers shared by the Streamlit UI and the PDF report.
+"""
+import json
+import math
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; stdlib json is used instead
+    orjson = None
+
+# Bound once so each call skips building a new format string
+_fmt_gbp = "£{:,.2f}".format
+
+
+def fmt_gbp(x: Any, default: str = "N/A") -> str:
+    """
+    Format an amount as GBP with thousands separators. Numeric strings ("200,000", "£1,500.5")
+    and NumPy scalars are converted first; other text is shown as-is and None returns `default`.
+    """
+    if x is None:
+        return default
+    if isinstance(x, (int, float)):
+        return _fmt_gbp(x)
+    try:
+        return _fmt_gbp(float(str(x).replace(",", "").replace("£", "")))
+    except ValueError:
+        return str(x)
+
+
+def _json_default(o: Any) -> Any:
+    # NumPy arrays/scalars become lists/floats; anything else falls back to str (as json.dumps(default=str) did)
+    return o.tolist() if hasattr(o, "tolist") else str(o)
+
+
+def json_bytes(payload: Any) -> bytes:
+    """Indented UTF-8 JSON for downloads, via orjson when installed (NumPy arrays serialised natively)."""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_json_default, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, indent=2, default=_json_default, ensure_ascii=False).encode("utf-8")
+
+
+def _all_finite(o: Any) -> bool:
+    if isinstance(o, float):
+        return math.isfinite(o)
+    if isinstance(o, dict):
+        return all(_all_finite(v) for v in o.values())
+    if isinstance(o, (list, tuple)):
+        return all(_all_finite(v) for v in o)
+    if hasattr(o, "tolist"):
+        return _all_finite(o.tolist())
+    return True
+
+
+def json_key(payload: Any) -> bytes:
+    """
+    Compact JSON with sorted keys, for use as a cache key (same payload -> same bytes).
+    Not a lossless encoding (e.g. tuples become lists, unknown types their str), so cache on it but
+    compute from the original payload. NaN/Inf go through stdlib json, which keeps them distinct from
+    None where orjson would write null.
+    """
+    if orjson is not None and _all_finite(payload):
+        return orjson.dumps(payload, default=_json_default, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, sort_keys=True, default=_json_default, separators=(",", ":")).encode("utf-8")
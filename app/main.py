@@ -12,21 +12,25 @@ Drop this file into app/main.py (overwrite existing) and restart Streamlit.
 from __future__ import annotations
 import os
 import sys
-import io
-import json
+import importlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime
 import typing
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+from app.formatting import fmt_gbp, json_bytes, json_key
+from app.ui_components import deferred_file_bytes
+from app.upload_handler import file_digest, store_upload
+
 # Defensive imports (these helper files should exist in app/)
 try:
     from app.metrics import compute_lending_metrics, amortization_schedule  # type: ignore
@@ -34,60 +38,184 @@ except Exception:
     compute_lending_metrics = None
     amortization_schedule = None
 
-try:
-    from app.parse_helpers import extract_embedded_kv, detect_implausible_loan  # type: ignore
-except Exception:
-    def extract_embedded_kv(parsed: dict) -> tuple[dict, list]:
-        return parsed or {}, []
-    def detect_implausible_loan(parsed: dict) -> bool:
-        return False
+def _no_embedded_kv(parsed: dict) -> tuple[dict, list]:
+    return parsed or {}, []
+
+def _never_implausible(parsed: dict) -> bool:
+    return False
+
+# A failed import isn't cached by Python, so it would be retried (path scan + exception) on every rerun:
+# resolve the optional helpers once per process instead
+@st.cache_resource(show_spinner=False)
+def _parse_helpers():
+    try:
+        from app.parse_helpers import extract_embedded_kv, detect_implausible_loan  # type: ignore
+        return extract_embedded_kv, detect_implausible_loan
+    except Exception:
+        return _no_embedded_kv, _never_implausible
+
+extract_embedded_kv, detect_implausible_loan = _parse_helpers()
+
+# Numeric fields normalised before metrics; other keys (and their spellings) pass through untouched
+_NUMERIC_FIELDS = ("loan_amount", "total_cost", "project_cost", "interest_rate_annual", "loan_term_months", "income", "property_value", "deposit_amount", "gdv", "monthly_rent")
+
+_NORM_STRIP = str.maketrans("", "", ",£")
+
+def _norm(v):
+    if isinstance(v, (int, float)):
+        return v
+    s = str(v).translate(_NORM_STRIP)
+    try:
+        if "." in s:
+            return float(s)
+        return int(s)
+    except Exception:
+        return v
+
+def _normalise(parsed: dict) -> dict:
+    """Copy of parsed with each numeric field that is present and not None normalised."""
+    out = dict(parsed)
+    for k in _NUMERIC_FIELDS:
+        v = parsed.get(k)
+        if v is not None:
+            out[k] = _norm(v)
+    return out
+
+def _next_group_id() -> str:
+    # output/supporting is shared by every session: the random suffix keeps concurrent saves apart
+    return f"{time.time_ns()}_{uuid.uuid4().hex[:8]}"
+
+_MAX_SUPPORTING_GROUPS = 20
+# file_id -> digest memo; an evicted upload is just hashed again (dedup goes by saved_digests)
+_MAX_UPLOAD_DIGESTS = 256
+
+def _remember_upload(group: str, digest: str, dest: str) -> None:
+    # Every saved digest stays in saved_digests (the dedup check); the group LRU only bounds what's kept per group
+    st.session_state["saved_digests"][digest] = dest
+    groups = st.session_state["supporting_groups"]
+    if not isinstance(groups, OrderedDict):
+        groups = st.session_state["supporting_groups"] = OrderedDict(groups)
+    groups.setdefault(group, {})[digest] = dest
+    groups.move_to_end(group)
+    while len(groups) > _MAX_SUPPORTING_GROUPS:
+        groups.popitem(last=False)
+
+# Metrics are recomputed on every rerun; memoise them (and their pretty-printed JSON for the raw view)
+# on a canonical JSON form of the inputs. The key only picks the cache entry: metrics are computed from
+# the original values (_parsed is left out of Streamlit's hash), never parsed back out of the key
+@st.cache_data(max_entries=128, show_spinner=False)
+def _cached_metrics(parsed_key: bytes, _parsed: dict) -> tuple:
+    parsed = dict(_parsed)
+    lm = compute_lending_metrics(parsed)
+    return lm, parsed["input_audit"], json_bytes(lm).decode("utf-8")
+
+# PDF generator (reportlab + PIL) is heavy: load it once per process, off the first render
+@st.cache_resource(show_spinner=False)
+def _load_pdf_writer():
+    try:
+        from app.pdf_form import create_pdf_from_dict  # type: ignore
+        return create_pdf_from_dict
+    except Exception:
+        return None
+
+# reportlab/PIL behind the PDF generator are warmed in the background. pandas (st.table) and plotly stay
+# lazy main-thread imports: warming them on a second thread races Streamlit's own pandas import
+_WARM_MODULES = ("app.pdf_form",)
+
+def _warm_imports():
+    for name in _WARM_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            pass
 
-try:
-    from app.pdf_form import create_pdf_from_dict  # type: ignore
-except Exception:
-    create_pdf_from_dict = None
+@st.cache_resource(show_spinner=False)
+def _start_warmup() -> threading.Thread:
+    t = threading.Thread(target=_warm_imports, name="bluecroft-warmup", daemon=True)
+    t.start()
+    return t
 
 st.set_page_config(page_title="Blue Croft Finance", layout="wide")
-
-# Styling: gradient background and centered title
-st.markdown(
-    """
-    <style>
-      .app-header {
-        background: linear-gradient(180deg, #0A2540 0%, #1E4B79 100%);
-        padding: 26px 0;
-        color: white;
-        text-align:center;
-        border-radius: 8px;
-        margin-bottom: 16px;
-      }
-      .app-title { font-size: 30px; font-weight:800; letter-spacing:1px; margin:0; }
-      .app-sub { font-size:14px; color:rgba(255,255,255,0.9); margin:6px 0 0 0; }
-      .report-container { max-width:980px; margin-left:auto; margin-right:auto; }
-      .resume { background:#fff; padding:20px; border-radius:6px; box-shadow: 0 6px 18px rgba(10,30,60,0.04); border:1px solid #e6eef5; font-family:Georgia, serif; }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
-
+_start_warmup()
+
+# Styling: gradient background and centered title (module constants, emitted as one markdown element)
+_CSS_BLOCK = """
+<style>
+  .app-header {
+    background: linear-gradient(180deg, #0A2540 0%, #1E4B79 100%);
+    padding: 26px 0;
+    color: white;
+    text-align:center;
+    border-radius: 8px;
+    margin-bottom: 16px;
+  }
+  .app-title { font-size: 30px; font-weight:800; letter-spacing:1px; margin:0; }
+  .app-sub { font-size:14px; color:rgba(255,255,255,0.9); margin:6px 0 0 0; }
+  .report-container { max-width:980px; margin-left:auto; margin-right:auto; }
+  .resume { background:#fff; padding:20px; border-radius:6px; box-shadow: 0 6px 18px rgba(10,30,60,0.04); border:1px solid #e6eef5; font-family:Georgia, serif; }
+</style>
+"""
 # Title exactly as requested
-st.markdown(f'<div class="app-header"><div class="app-title">Blue Croft Finance</div><div class="app-sub">Bridging loan calculator & underwriting report</div></div>', unsafe_allow_html=True)
-
-# Ensure output dirs
-os.makedirs(ROOT / "output" / "generated_pdfs", exist_ok=True)
-os.makedirs(ROOT / "output" / "uploaded_pdfs", exist_ok=True)
-os.makedirs(ROOT / "output" / "supporting_docs", exist_ok=True)
-
-# Session defaults (JSON-serializable)
-for k, v in [
-    ("uploaded_files", []),
-    ("generated_pdf", None),
-    ("uploaded_pdf", None),
-    ("calc_result", None),
-    ("last_analysis", None),
-]:
-    if k not in st.session_state:
-        st.session_state[k] = v
+_HEADER_HTML = '<div class="app-header"><div class="app-title">Blue Croft Finance</div><div class="app-sub">Bridging loan calculator & underwriting report</div></div>'
+st.markdown(_CSS_BLOCK + _HEADER_HTML, unsafe_allow_html=True)
+
+# Ensure output dirs (once per process rather than three mkdir calls on every rerun)
+@st.cache_resource(show_spinner=False)
+def _ensure_output_dirs() -> bool:
+    for sub in ("generated_pdfs", "uploaded_pdfs", "supporting_docs"):
+        os.makedirs(ROOT / "output" / sub, exist_ok=True)
+    return True
+
+_ensure_output_dirs()
+
+# Session defaults (JSON-serializable); only keys the session doesn't have yet are merged in
+_SESSION_DEFAULTS = {
+    "uploaded_files": [],
+    "generated_pdf": None,
+    "uploaded_pdf": None,
+    "calc_result": None,
+    "last_analysis": None,
+    "supporting_groups": OrderedDict(),  # group -> {sha256: saved path}, most recent last
+    "upload_digests": OrderedDict(),  # uploader file_id -> sha256, most recent last
+    "saved_digests": {},  # sha256 -> saved path, never evicted: content already saved this session
+}
+_missing = _SESSION_DEFAULTS.keys() - st.session_state.keys()
+if _missing:
+    st.session_state.update({k: _SESSION_DEFAULTS[k] for k in _missing})
+
+# Submitting notes / generating a PDF reruns only this fragment, not the charts and metrics above it
+@st.fragment
+def _report_fragment(parsed: dict, metrics: dict) -> None:
+    # allow adding a short notes field; in a form so the notes and the click arrive as one rerun
+    with st.form("report_form", border=False):
+        report_notes = st.text_area("Notes for report (optional)", height=80)
+        generate = st.form_submit_button("Generate PDF Report")
+    if generate:
+        # Build a payload for PDF
+        attachments = st.session_state.get("uploaded_files", [])
+        report_payload = {
+            "parsed": parsed,
+            "metrics": metrics,
+            "notes": report_notes,
+            "attachments": attachments,
+            "generated_at": datetime.utcnow().isoformat()
+        }
+        # If pdf generator is available, call it; otherwise fall back to writing JSON
+        create_pdf_from_dict = _load_pdf_writer()
+        if create_pdf_from_dict:
+            try:
+                path = create_pdf_from_dict(report_payload)
+                st.session_state["generated_pdf"] = path
+                st.success(f"PDF generated: {path}")
+                # Read lazily (and cached on path + mtime): the bytes are only loaded when the button is clicked
+                st.download_button("Download generated PDF", data=deferred_file_bytes(path), file_name=Path(path).name, mime="application/pdf")
+            except Exception as e:
+                st.error("PDF generation failed: " + str(e))
+                # fallback write JSON
+                st.download_button("Download JSON report", data=lambda: json_bytes(report_payload), file_name="underwriting_report.json", mime="application/json")
+        else:
+            # fallback write JSON
+            st.download_button("Download JSON report", data=lambda: json_bytes(report_payload), file_name="underwriting_report.json", mime="application/json")
 
 # Layout: two columns (left input, right preview/report)
 left, right = st.columns([4, 6])
@@ -128,18 +256,33 @@ with left:
         st.markdown("Upload supporting documents (valuation, photos, models)")
         uploads = st.file_uploader("Drop files here", accept_multiple_files=True, type=None, help="PDF, images, xlsx, etc.")
         if uploads:
-            # save uploaded files to output/supporting_docs/<timestamp>/
-            group = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+            # save uploaded files to output/supporting_docs/<group id>/, skipping content already saved
+            # (the uploader keeps its files across reruns, so the same bytes come back every time)
+            group = None
+            known = st.session_state["saved_digests"]
             saved = []
+            digests = st.session_state["upload_digests"]
             for f in uploads:
+                # Hash each upload once: later reruns look its digest up by the uploader's file_id
+                digest = digests.get(f.file_id)
+                if digest is None:
+                    digest = digests[f.file_id] = file_digest(f)
+                    while len(digests) > _MAX_UPLOAD_DIGESTS:
+                        digests.popitem(last=False)
+                else:
+                    digests.move_to_end(f.file_id)
+                if digest in known:
+                    continue
+                if group is None:
+                    group = _next_group_id()
                 out = ROOT / "output" / "supporting_docs" / group
                 out.mkdir(parents=True, exist_ok=True)
-                dest = out / f.name
-                with open(dest, "wb") as fh:
-                    fh.write(f.getbuffer())
-                saved.append(str(dest))
-            st.session_state["uploaded_files"] = st.session_state.get("uploaded_files", []) + saved
-            st.success(f"Saved {len(saved)} supporting files")
+                dest = store_upload(f, out / f.name, digest, ROOT / "output" / "supporting_docs" / "_cas")
+                _remember_upload(group, digest, dest)
+                saved.append(dest)
+            if saved:
+                st.session_state["uploaded_files"] = st.session_state.get("uploaded_files", []) + saved
+                st.success(f"Saved {len(saved)} supporting files")
 
         submitted = st.form_submit_button("Run quick calculation (preview)")
         # Also Quick Calculator shortcut
@@ -160,10 +303,8 @@ with left:
 
     # show uploaded files list
     if st.session_state.get("uploaded_files"):
-        st.markdown("Uploaded supporting files:")
-        for p in st.session_state["uploaded_files"]:
-            fname = Path(p).name
-            st.write(f"- {fname}")
+        # one markdown element for the whole list rather than one per file
+        st.markdown("Uploaded supporting files:\n\n" + "\n".join(f"- {Path(p).name}" for p in st.session_state["uploaded_files"]))
 
 with right:
     st.header("Preview & Analysis")
@@ -172,6 +313,7 @@ with right:
     source_opts = []
     if st.session_state.get("uploaded_pdf"):
         source_opts.append("Uploaded PDF")
+    # Only the PDF this session generated: output/generated_pdfs is shared by every user
     if st.session_state.get("generated_pdf"):
         source_opts.append("Most recent generated PDF")
     if st.session_state.get("calc_result"):
@@ -211,22 +353,7 @@ with right:
         st.info(f"Extracted machine fields: {', '.join(extracted)}")
 
     # Normalize numeric-ish strings a little
-    def _norm(v):
-        if v is None:
-            return None
-        if isinstance(v, (int, float)):
-            return v
-        s = str(v).replace(",", "").replace("£", "")
-        try:
-            if "." in s:
-                return float(s)
-            return int(s)
-        except Exception:
-            return v
-
-    for k in ("loan_amount", "total_cost", "project_cost", "interest_rate_annual", "loan_term_months", "income", "property_value", "deposit_amount", "gdv", "monthly_rent"):
-        if k in parsed and parsed.get(k) is not None:
-            parsed[k] = _norm(parsed.get(k))
+    parsed = _normalise(parsed)
 
     # Detect implausible small loan (user-friendly prompt)
     if detect_implausible_loan(parsed):
@@ -234,7 +361,8 @@ with right:
 
     # Compute metrics (use compute_lending_metrics if present)
     if compute_lending_metrics:
-        metrics = compute_lending_metrics(parsed)
+        metrics, parsed["input_audit"], metrics_json = _cached_metrics(json_key(parsed), parsed)
+        parsed["lending_metrics"] = metrics
     else:
         # fallback compute minimal:
         metrics = {
@@ -251,10 +379,11 @@ with right:
             "risk_reasons": [],
             "amortization_preview_rows": None
         }
+        metrics_json = json_bytes(metrics).decode("utf-8")
 
     # Display Raw JSON metrics & human summary
     st.subheader("Raw JSON metrics")
-    st.json(metrics)
+    st.json(metrics_json)
 
     st.subheader("Human-readable summary")
     # Make a professional short summary
@@ -264,15 +393,18 @@ with right:
         ltv = m.get("ltv")
         ltv_str = f"{ltv*100:.1f}%" if isinstance(ltv, (int, float)) else "N/A"
         risk = m.get("risk_category", "N/A")
-        s = f"{borrower}: Loan {loan_amt} — LTV {ltv_str} — Risk: {risk}."
+        s = f"{borrower}: Loan {fmt_gbp(loan_amt)} — LTV {ltv_str} — Risk: {risk}."
         return s
     st.markdown(f"**{human_summary(parsed, metrics)}**")
 
     # Visual indicators
     st.markdown("### Visual indicators")
     col1, col2, col3 = st.columns(3)
-    # LTV indicator
+    # Bind the metrics used by the indicators and charts once
     ltv = metrics.get("ltv")
+    ltc = metrics.get("ltc")
+    risk_category = metrics.get("risk_category", "N/A")
+    risk_score = metrics.get("risk_score_computed")
     def indicator_color(val):
         if val is None:
             return "gray"
@@ -289,41 +421,48 @@ with right:
             st.metric("", f"{ltv*100:.1f}%", delta=None)
     with col2:
         st.markdown("LTC")
-        ltc = metrics.get("ltc")
         st.metric("", f"{ltc*100:.1f}%" if ltc is not None else "N/A")
     with col3:
         st.markdown("Risk")
-        st.write(f"{metrics.get('risk_category','N/A')} — score {metrics.get('risk_score_computed')}")
+        st.write(f"{risk_category} — score {risk_score}")
 
     # Charts: LTV vs LTC bar, monthly interest costs line, risk gauge (donut)
     st.markdown("### Charts")
+    # Traces are built straight from the values/arrays (no plotly.express DataFrame round-trip)
+    import plotly.graph_objects as go
     # Prepare values
-    ltv_val = metrics.get("ltv") or 0.0
-    ltc_val = metrics.get("ltc") or 0.0
-    df_bar = pd.DataFrame({"metric": ["LTV", "LTC"], "value": [ltv_val * 100, ltc_val * 100]})
-    fig_bar = px.bar(df_bar, x="metric", y="value", text="value", range_y=[0, max(100, df_bar.value.max() + 10)], color="metric", color_discrete_map={"LTV":"#1f77b4","LTC":"#ff7f0e"})
+    ltv_val = ltv or 0.0
+    ltc_val = ltc or 0.0
+    bars = (("LTV", ltv_val * 100, "#1f77b4"), ("LTC", ltc_val * 100, "#ff7f0e"))
+    fig_bar = go.Figure([go.Bar(x=[name], y=[v], text=[v], name=name, marker_color=c) for name, v, c in bars])
+    fig_bar.update_layout(
+        xaxis_title="metric", yaxis_title="value", legend_title_text="metric", barmode="relative",
+        yaxis_range=[0, max(100, ltv_val * 100 + 10, ltc_val * 100 + 10)],
+    )
     st.plotly_chart(fig_bar, use_container_width=True)
 
     # Monthly interest costs line (amort schedule if available)
     st.markdown("Monthly interest costs")
     amort_preview = metrics.get("amortization_preview_rows")
     if amort_preview:
-        df_am = pd.DataFrame(amort_preview)
-        fig_line = px.line(df_am, x="month", y="interest", title="Monthly interest (first months)")
+        # preview is a dict of column lists
+        fig_line = go.Figure(go.Scatter(x=amort_preview["month"], y=amort_preview["interest"], mode="lines"))
+        fig_line.update_layout(title="Monthly interest (first months)", xaxis_title="month", yaxis_title="interest")
         st.plotly_chart(fig_line, use_container_width=True)
     else:
         # show interest-only monthly as constant line
         monthly_io = metrics.get("monthly_interest_only_payment")
         if monthly_io is not None:
             months = list(range(1, 13))
-            fig = px.line(x=months, y=[monthly_io]*len(months), labels={"x":"Month","y":"Interest (£)"}, title="Interest-only monthly")
+            fig = go.Figure(go.Scatter(x=months, y=[monthly_io] * len(months), mode="lines"))
+            fig.update_layout(title="Interest-only monthly", xaxis_title="Month", yaxis_title="Interest (£)")
             st.plotly_chart(fig, use_container_width=True)
         else:
             st.write("No monthly interest data available. Provide loan, rate and term.")
 
     # Risk gauge (simple donut)
     st.markdown("Risk score")
-    rscore = metrics.get("risk_score_computed") or 0.0
+    rscore = risk_score or 0.0
     fig_g = go.Figure(data=[go.Pie(values=[rscore, max(0, 1 - rscore)], hole=0.6, marker_colors=["#d62728" if rscore > 0.7 else "#ffae42" if rscore > 0.4 else "#2ca02c", "#eee"])])
     fig_g.update_layout(showlegend=False, margin=dict(t=0,b=0,l=0,r=0), annotations=[dict(text=f"{rscore:.2f}", x=0.5, y=0.5, showarrow=False, font=dict(size=18))])
     st.plotly_chart(fig_g, use_container_width=True, height=220)
@@ -331,7 +470,7 @@ with right:
     # Amortisation table if present
     st.markdown("### Amortisation preview")
     if amort_preview:
-        st.table(pd.DataFrame(amort_preview).head(12))
+        st.table(amort_preview)
     else:
         st.info("No amortisation schedule available (provide loan, rate and term).")
 
@@ -341,47 +480,14 @@ with right:
     bank_flags = metrics.get("bank_red_flags") or []
     all_flags = flags + bank_flags
     if all_flags:
-        for f in all_flags:
-            st.write(f"- {f}")
+        st.markdown("\n".join(f"- {f}" for f in all_flags))
     else:
         st.write("No policy or bank red flags detected.")
 
     # Generate Professional PDF Report
     st.markdown("---")
     st.markdown("#### Generate professional report (PDF)")
-    # allow adding a short notes field
-    report_notes = st.text_area("Notes for report (optional)", height=80)
-    if st.button("Generate PDF Report"):
-        # Build a payload for PDF
-        attachments = st.session_state.get("uploaded_files", [])
-        report_payload = {
-            "parsed": parsed,
-            "metrics": metrics,
-            "notes": report_notes,
-            "attachments": attachments,
-            "generated_at": datetime.utcnow().isoformat()
-        }
-        # If pdf generator is available, call it; otherwise fall back to writing JSON
-        if create_pdf_from_dict:
-            try:
-                path = create_pdf_from_dict(report_payload)
-                st.session_state["generated_pdf"] = path
-                st.success(f"PDF generated: {path}")
-                with open(path, "rb") as fh:
-                    st.download_button("Download generated PDF", data=fh.read(), file_name=Path(path).name, mime="application/pdf")
-            except Exception as e:
-                st.error("PDF generation failed: " + str(e))
-                # fallback write JSON
-                buf = io.BytesIO()
-                buf.write(json.dumps(report_payload, indent=2, default=str).encode("utf-8"))
-                buf.seek(0)
-                st.download_button("Download JSON report", data=buf, file_name="underwriting_report.json", mime="application/json")
-        else:
-            # fallback write JSON
-            buf = io.BytesIO()
-            buf.write(json.dumps(report_payload, indent=2, default=str).encode("utf-8"))
-            buf.seek(0)
-            st.download_button("Download JSON report", data=buf, file_name="underwriting_report.json", mime="application/json")
+    _report_fragment(parsed, metrics)
 
 # Footer
 st.markdown("<div style='text-align:center; color:#556; margin-top:18px;'>Blue Croft Finance &middot; Underwriting assistant</div>", unsafe_allow_html=True)
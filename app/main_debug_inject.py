@@ -1,16 +1,28 @@
 # DIAGNOSTIC / FORCE-INJECT: paste this after `import streamlit as st`
+# Log output only with BLUECROFT_DIAG=1 set in the environment, so normal reruns skip the checks
+import os
 from pathlib import Path
 _css_path = Path(__file__).parent / "static" / "styles.css"
 
+# Read once per process and re-read only when the file's mtime changes (the snippet reruns with the script)
+@st.cache_data(show_spinner=False)
+def _load_css(path: str, mtime: float) -> str:
+    return Path(path).read_text(encoding="utf-8")
+
 # Print diagnostic to server logs so you can inspect in Streamlit Cloud logs
-print("DEBUG: checking for styles.css at", _css_path)
-print("DEBUG: styles.css exists?", _css_path.exists())
-if _css_path.exists():
+if os.environ.get("BLUECROFT_DIAG") == "1":
+    print("DEBUG: checking for styles.css at", _css_path)
     try:
-        s = _css_path.read_text(encoding="utf-8")
-        print("DEBUG: styles.css first 400 chars:\\n", s[:400].replace("\\n", "\\\\n"))
-    except Exception as e:
-        print("DEBUG: failed to read styles.css:", e)
+        _css_mtime = _css_path.stat().st_mtime
+    except OSError:
+        _css_mtime = None
+    print("DEBUG: styles.css exists?", _css_mtime is not None)
+    if _css_mtime is not None:
+        try:
+            s = _load_css(str(_css_path), _css_mtime)
+            print("DEBUG: styles.css first 400 chars:\\n", s[:400].replace("\\n", "\\\\n"))
+        except Exception as e:
+            print("DEBUG: failed to read styles.css:", e)
 
 # Force-inject a small inline style to guarantee visible background while debugging
 # (remove this after you confirm styles.css loads)
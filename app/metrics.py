@@ -6,124 +6,160 @@ Implements:
 - compute_lending_metrics(parsed): returns a metrics dict and attaches parsed['input_audit'] and parsed['lending_metrics']
 - amortization_schedule(loan_amount, annual_rate_decimal, term_months): pandas DataFrame
 """
-from typing import Optional, Dict, Any, List, Tuple
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Tuple
+import math
 import re
-import pandas as pd
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+from app._amort_kernel import payment, schedule, schedule_head
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; kernels then run as plain Python
+    def njit(*args, **kwargs):
+        return lambda fn: fn
+
+# Thousands separators and currency/percent signs dropped in one C-level pass
+_NUM_STRIP = str.maketrans("", "", ",£$%")
+_NUM_RE = re.compile(r"-?\d+(\.\d+)?")
 
 def _to_float(v: Optional[Any]) -> Optional[float]:
     if v is None:
         return None
     if isinstance(v, (int, float)):
         return float(v)
-    s = str(v).strip()
+    s = str(v).translate(_NUM_STRIP).strip()
     if s == "":
         return None
-    s = s.replace(",", "").replace("£", "").replace("$", "").replace("%", "")
     try:
         return float(s)
     except Exception:
-        m = re.search(r"-?\d+(\.\d+)?", s)
+        m = _NUM_RE.search(s)
         if m:
             return float(m.group(0))
         return None
 
-def amortization_schedule(loan_amount: float, annual_rate_decimal: float, term_months: int) -> pd.DataFrame:
+def _f(d: Dict[str, Any], *keys: str) -> Optional[float]:
+    """
+    Float of the first truthy value among keys (same precedence as a `d.get(a) or d.get(b)` chain).
+    """
+    for k in keys:
+        v = d.get(k)
+        if v:
+            return _to_float(v)
+    return None
+
+def _nan_if_none(v: Optional[float]) -> float:
+    return math.nan if v is None else float(v)
+
+def _none_if_nan(v: float) -> Optional[float]:
+    return None if math.isnan(v) else float(v)
+
+@njit(cache=True)
+def _metrics_kernel(loan, prop, project_cost, annual_rate, term_months, noi):
+    """
+    LTV, LTC, monthly payments, total interest and DSCRs from scalar inputs.
+    NaN marks a missing input or result.
+    """
+    ltv = loan / prop if prop != 0.0 else np.nan
+    ltc = loan / project_cost if project_cost != 0.0 else np.nan
+    monthly_am = np.nan
+    total_interest = np.nan
+    r = annual_rate / 12.0
+    if term_months > 0 and 1.0 + r > 0.0:
+        pmt = payment(loan, r, term_months)
+        monthly_am = round(pmt, 2)
+        # closed form: n level payments less the principal
+        total_interest = pmt * term_months - loan
+    monthly_io = loan * annual_rate / 12.0
+    dscr_am = noi / (monthly_am * 12.0) if monthly_am > 0.0 else np.nan
+    dscr_io = noi / (monthly_io * 12.0) if monthly_io > 0.0 else np.nan
+    return ltv, ltc, monthly_am, monthly_io, total_interest, dscr_am, dscr_io
+
+# Compile (or load from numba's on-disk cache) at import so the first analysis doesn't pay for it
+_metrics_kernel(1.0, 1.0, 1.0, 0.05, 12, 1.0)
+
+def amortization_schedule(loan_amount: float, annual_rate_decimal: float, term_months: int) -> "pd.DataFrame":
+    import pandas as pd  # deferred: only needed once a schedule is built
+
     P = float(loan_amount)
     n = int(term_months)
     if n <= 0:
         raise ValueError("term_months must be > 0")
     r_month = float(annual_rate_decimal) / 12.0 if annual_rate_decimal else 0.0
-    if r_month == 0:
-        payment = P / n
-    else:
-        payment = P * r_month / (1 - (1 + r_month) ** (-n))
-    balance = P
-    rows = []
-    for m in range(1, n + 1):
-        interest = balance * r_month
-        principal = payment - interest
-        if m == n:
-            principal = balance
-            payment = interest + principal
-            balance = 0.0
-        else:
-            balance = max(balance - principal, 0.0)
-        rows.append({
-            "month": m,
-            "payment": round(payment, 2),
-            "interest": round(interest, 2),
-            "principal": round(principal, 2),
-            "balance": round(balance, 2)
-        })
-    return pd.DataFrame(rows)
+    pay, intr, prin, bal = schedule(P, r_month, n)
+    df = pd.DataFrame({
+        "month": np.arange(1, n + 1),
+        "payment": pay,
+        "interest": intr,
+        "principal": prin,
+        "balance": bal,
+    })
+    return df.round({"payment": 2, "interest": 2, "principal": 2, "balance": 2})
+
+def _preview_columns(loan: float, rate: float, term: int, rows: int = 12) -> Dict[str, List[float]]:
+    """
+    First `rows` months of the schedule as rounded columns (month, payment, interest, principal, balance).
+    Plain lists, so the metrics stay JSON-serialisable for the LLM prompts and exports.
+    """
+    payment, interest, principal, balance = schedule_head(loan, rate / 12.0, term, rows)
+    return {
+        "month": list(range(1, len(payment) + 1)),
+        "payment": np.round(payment, 2).tolist(),
+        "interest": np.round(interest, 2).tolist(),
+        "principal": np.round(principal, 2).tolist(),
+        "balance": np.round(balance, 2).tolist(),
+    }
+
+# Audit line for each missing input, in the order loan, property, project cost, rate, term
+_AUDIT_MESSAGES = (
+    "Missing or invalid loan_amount",
+    "Missing or invalid property_value or purchase_price",
+    "project_cost / total_cost not provided",
+    "Interest rate not provided or invalid",
+    "Loan term (months) not provided or invalid",
+)
 
 def compute_lending_metrics(parsed: Dict[str, Any]) -> Dict[str, Any]:
-    loan = _to_float(parsed.get("loan_amount") or parsed.get("loan"))
-    prop = _to_float(parsed.get("property_value") or parsed.get("property") or parsed.get("purchase_price"))
-    project_cost = _to_float(parsed.get("total_cost") or parsed.get("project_cost"))
-    rate = _to_float(parsed.get("interest_rate_annual") or parsed.get("interest_rate") or parsed.get("rate"))
-    term = parsed.get("loan_term_months") or parsed.get("term_months") or parsed.get("term")
-    try:
-        term = int(term) if term is not None else None
-    except Exception:
-        term = None
-
-    audit: List[str] = []
-    if loan is None:
-        audit.append("Missing or invalid loan_amount")
-    if prop is None:
-        audit.append("Missing or invalid property_value or purchase_price")
-    if project_cost is None:
-        audit.append("project_cost / total_cost not provided")
-    if rate is None:
-        audit.append("Interest rate not provided or invalid")
-    if term is None:
-        audit.append("Loan term (months) not provided or invalid")
+    loan = _f(parsed, "loan_amount", "loan")
+    prop = _f(parsed, "property_value", "property", "purchase_price")
+    project_cost = _f(parsed, "total_cost", "project_cost")
+    rate = _f(parsed, "interest_rate_annual", "interest_rate", "rate")
+    term = _f(parsed, "loan_term_months", "term_months", "term")
+    term = int(term) if term is not None and math.isfinite(term) else None
+
+    audit: List[str] = [msg for value, msg in zip((loan, prop, project_cost, rate, term), _AUDIT_MESSAGES) if value is None]
 
     # Normalise rate: if percent >1 treat as percent
     if rate is not None and rate > 1:
         rate = rate / 100.0
 
-    # LTV & LTC
-    ltv = loan / prop if loan is not None and prop not in (None, 0) else None
-    ltc = loan / project_cost if loan is not None and project_cost not in (None, 0) else None
-
-    # Amortisation & payments
-    amort_df = None
-    monthly_amort = None
-    total_interest = None
-    if loan is not None and rate is not None and term:
-        try:
-            amort_df = amortization_schedule(loan, rate, term)
-            monthly_amort = float(amort_df["payment"].iloc[0])
-            total_interest = float(amort_df["interest"].sum())
-        except Exception:
-            amort_df = None
-
-    # Interest-only monthly
-    monthly_io = None
-    if loan is not None and rate is not None:
-        monthly_io = loan * rate / 12.0
-
     # NOI estimation: prefer NOI if provided, else monthly_rent*12 - operating_costs, else income*0.3 proxy
     noi = _to_float(parsed.get("noi"))
-    if noi is None and parsed.get("monthly_rent"):
-        try:
-            noi = float(parsed.get("monthly_rent")) * 12.0 - float(parsed.get("operating_costs") or 0.0)
-        except Exception:
-            noi = None
-    if noi is None and parsed.get("income"):
-        noi = float(parsed.get("income")) * 0.30
-
-    # DSCR
-    dscr_am = None
-    dscr_io = None
-    if noi is not None and monthly_amort:
-        annual_ds_am = monthly_amort * 12.0
-        dscr_am = noi / annual_ds_am if annual_ds_am > 0 else None
-    if noi is not None and monthly_io:
-        annual_ds_io = monthly_io * 12.0
-        dscr_io = noi / annual_ds_io if annual_ds_io > 0 else None
+    if noi is None:
+        rent = _f(parsed, "monthly_rent")
+        if rent is not None:
+            noi = rent * 12.0 - (_f(parsed, "operating_costs") or 0.0)
+    if noi is None:
+        income = _f(parsed, "income")
+        if income is not None:
+            noi = income * 0.30
+
+    # LTV & LTC, payments, total interest and DSCR in one compiled pass
+    ltv, ltc, monthly_amort, monthly_io, total_interest, dscr_am, dscr_io = (
+        _none_if_nan(v) for v in _metrics_kernel(
+            _nan_if_none(loan), _nan_if_none(prop), _nan_if_none(project_cost),
+            _nan_if_none(rate), int(term or 0), _nan_if_none(noi),
+        )
+    )
+
+    # Only the preview months are materialised; the renderers build the full schedule when they need it
+    preview = None
+    if loan is not None and rate is not None and term is not None and term > 0:
+        preview = _preview_columns(loan, rate, term)
 
     # Flags
     policy_flags = []
@@ -136,7 +172,7 @@ def compute_lending_metrics(parsed: Dict[str, Any]) -> Dict[str, Any]:
         policy_flags.append("Low DSCR (≤1.2)")
     if parsed.get("income") is None:
         policy_flags.append("Missing income")
-    if amort_df is None:
+    if preview is None:
         policy_flags.append("Missing amortisation data")
 
     # Risk scoring
@@ -163,7 +199,7 @@ def compute_lending_metrics(parsed: Dict[str, Any]) -> Dict[str, Any]:
         "risk_score_computed": round(risk_score, 3),
         "risk_category": risk_cat,
         "risk_reasons": policy_flags or ["No automated flags detected"],
-        "amortization_preview_rows": amort_df.head(12).to_dict(orient="records") if amort_df is not None else None,
+        "amortization_preview_rows": preview,
         "amortization_total_interest": round(total_interest,2) if total_interest else None
     }
 
@@ -10,6 +10,11 @@ from typing import Dict, Any, Tuple, List
 _num_rx = re.compile(r'(-?\d[\d,\.]*)')
 _kv_rx = re.compile(r'(?:["\']?\b([A-Za-z0-9_ \(\)\-]+?)["\']?\s*[:=]\s*(?:["\']?([^\n\r,,{}]+?)["\']?))', re.I)
 _json_kv_rx = re.compile(r'"([^"]+)"\s*:\s*(".*?"|[0-9.\-]+)', re.I)
+_int_rx = re.compile(r'-?\d+')
+_float_rx = re.compile(r'-?\d+\.\d+')
+_non_word_rx = re.compile(r'[^\w]')
+# Currency/grouping punctuation dropped in one pass
+_num_strip = str.maketrans("", "", ",£$%")
 
 def _to_number(s: str):
     if s is None:
@@ -19,11 +24,11 @@ def _to_number(s: str):
         return None
     if (s.startswith('"') and s.endswith('"')) or (s.startswith("'") and s.endswith("'")):
         s = s[1:-1].strip()
-    s_clean = s.replace(",", "").replace("£", "").replace("$", "").replace("%", "").strip()
+    s_clean = s.translate(_num_strip).strip()
     try:
-        if re.fullmatch(r'-?\d+', s_clean):
+        if _int_rx.fullmatch(s_clean):
             return int(s_clean)
-        if re.fullmatch(r'-?\d+\.\d+', s_clean):
+        if _float_rx.fullmatch(s_clean):
             return float(s_clean)
     except Exception:
         pass
@@ -44,7 +49,7 @@ def _to_number(s: str):
 def _normalize_key_label(label: str) -> str:
     if not label:
         return ""
-    return re.sub(r'[^\w]', '_', label.strip()).lower()
+    return _non_word_rx.sub('_', label.strip()).lower()
 
 def extract_embedded_kv(parsed: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
     if parsed is None:
@@ -11,15 +11,13 @@ payload = {
   "generated_at": "..."
 }
 
-Uses reportlab + matplotlib/PIL to include charts and images inline.
+Uses reportlab + PIL to include charts and images inline (chart PNGs are rendered elsewhere).
 """
 from __future__ import annotations
-import io
 import os
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, List
-import matplotlib.pyplot as plt
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
@@ -27,24 +25,22 @@ from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from PIL import Image as PILImage
 
+from app.formatting import fmt_gbp
+
 ROOT = Path(__file__).resolve().parents[1]
 OUT_DIR = ROOT / "output" / "generated_pdfs"
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 
 def _safe_image_for_pdf(path: str, max_width_mm: float = 160.0) -> str:
     """
-    Ensure image exists and optionally resize; return path (may overwrite small temp file)
+    Ensure the path is a readable image; return it unchanged, or None if it isn't
     """
     try:
-        img = PILImage.open(path)
-        # convert to RGB if needed
-        if img.mode in ("RGBA", "P"):
-            img = img.convert("RGB")
-        # Save temporary resized copy if width too large
-        max_px = int((max_width_mm / 25.4) * img.info.get("dpi", (96,96))[0] if img.info.get("dpi") else max(img.size))
-        # We'll simply return original path; let reportlab scale at insertion time
-        tmp_path = path
-        return tmp_path
+        # PIL.open only parses the header: enough to reject non-images without decoding the pixels
+        # (reportlab reads and scales the file itself at insertion time)
+        with PILImage.open(path):
+            pass
+        return path
     except Exception:
         return None
 
@@ -69,8 +65,8 @@ def create_pdf_report(payload: Dict[str, Any]) -> str:
     # Key facts table
     key_rows = []
     key_rows.append(["Borrower", parsed.get("borrower", "N/A")])
-    key_rows.append(["Loan amount", f"£{parsed.get('loan_amount', 'N/A')}"])
-    key_rows.append(["Project / Total cost", f"£{parsed.get('total_cost', parsed.get('project_cost', 'N/A'))}"])
+    key_rows.append(["Loan amount", fmt_gbp(parsed.get("loan_amount"))])
+    key_rows.append(["Project / Total cost", fmt_gbp(parsed.get("total_cost", parsed.get("project_cost")))])
     key_rows.append(["Interest rate (annual)", f"{parsed.get('interest_rate_annual', 'N/A')}%"])
     key_rows.append(["Loan term (months)", f"{parsed.get('loan_term_months','N/A')}"])
     t = Table(key_rows, colWidths=[100*mm, 70*mm])
@@ -108,8 +104,9 @@ def create_pdf_report(payload: Dict[str, Any]) -> str:
     if amort:
         elements.append(Paragraph("<b>Amortization (preview)</b>", styles["Heading4"]))
         rows = [["Month","Payment","Interest","Principal","Balance"]]
-        for r in amort:
-            rows.append([r.get("month"), f"£{r.get('payment'):,}", f"£{r.get('interest'):,}", f"£{r.get('principal'):,}", f"£{r.get('balance'):,}"])
+        # preview is column-oriented: {"month": [...], "payment": [...], ...}
+        for month, payment, interest, principal, balance in zip(*(amort[c] for c in ("month", "payment", "interest", "principal", "balance"))):
+            rows.append([int(month), fmt_gbp(payment), fmt_gbp(interest), fmt_gbp(principal), fmt_gbp(balance)])
         tbl = Table(rows, colWidths=[18*mm,30*mm,30*mm,30*mm,40*mm])
         tbl.setStyle(TableStyle([('GRID',(0,0),(-1,-1),0.25,colors.grey),('BACKGROUND',(0,0),(-1,0),colors.whitesmoke)]))
         elements.append(tbl)
@@ -1,14 +1,19 @@
 import math
-import io
+import functools
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import TYPE_CHECKING, Dict, Any, Optional
 
-import pandas as pd
-import altair as alt
+import numpy as np
 import streamlit as st
 
+if TYPE_CHECKING:
+    import pandas as pd
 
-def amortization_schedule(loan_amount: float, annual_rate: float, term_months: int) -> pd.DataFrame:
+from app.formatting import fmt_gbp, json_bytes
+from app._amort_kernel import schedule
+
+
+def amortization_schedule(loan_amount: float, annual_rate: float, term_months: int) -> "pd.DataFrame":
     """
     Returns a DataFrame with columns:
       month (1..n), payment, interest, principal, balance
@@ -19,152 +24,313 @@ def amortization_schedule(loan_amount: float, annual_rate: float, term_months: i
     P = float(loan_amount)
     r = float(annual_rate) / 12.0 if annual_rate is not None else 0.0
     n = int(term_months)
-    if r == 0:
-        payment = P / n
-    else:
-        payment = P * r / (1 - (1 + r) ** (-n))
-    rows = []
-    balance = P
-    for m in range(1, n + 1):
-        interest = balance * r
-        principal = payment - interest
-        # guard final payment rounding
-        if m == n:
-            principal = balance
-            payment = interest + principal
-            balance = 0.0
-        else:
-            balance = balance - principal
-        rows.append({"month": m, "payment": round(payment, 2), "interest": round(interest, 2),
-                     "principal": round(principal, 2), "balance": round(balance, 2)})
-    df = pd.DataFrame(rows)
-    return df
-
-
-def chart_amortization_balance(df: pd.DataFrame, width=600, height=320):
+    payment, interest, principal, balance = schedule(P, r, n)
+    import pandas as pd  # deferred: only needed once a schedule is built
+    df = pd.DataFrame({
+        "month": np.arange(1, n + 1),
+        "payment": payment,
+        "interest": interest,
+        "principal": principal,
+        "balance": balance,
+    })
+    return df.round({"payment": 2, "interest": 2, "principal": 2, "balance": 2})
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _cached_amort(loan_amount: float, annual_rate: float, term_months: int):
+    """
+    Schedule plus principal/interest totals, memoised across reruns on the three loan inputs.
+    """
+    df = amortization_schedule(loan_amount, annual_rate, term_months)
+    return df, float(df["principal"].to_numpy().sum()), float(df["interest"].to_numpy().sum())
+
+
+@functools.lru_cache(maxsize=8)
+def chart_amortization_balance(width=600, height=320) -> Dict[str, Any]:
     """
     Line/area chart showing remaining balance over time.
+    Returns a Vega-Lite spec; pass the schedule DataFrame as data to st.vega_lite_chart.
+    Cached on its arguments, so treat the returned dict as read-only.
     """
-    base = alt.Chart(df).encode(x=alt.X("month:Q", title="Month"))
-    balance_line = base.mark_line(color="#1f77b4", strokeWidth=2).encode(y=alt.Y("balance:Q", title="Remaining balance (£)"))
-    balance_area = base.mark_area(opacity=0.12, color="#1f77b4").encode(y="balance:Q")
-    return (balance_area + balance_line).properties(width=width, height=height)
+    return {
+        "width": width,
+        "height": height,
+        "encoding": {"x": {"field": "month", "type": "quantitative", "title": "Month"}},
+        "layer": [
+            {
+                "mark": {"type": "area", "opacity": 0.12, "color": "#1f77b4"},
+                "encoding": {"y": {"field": "balance", "type": "quantitative"}},
+            },
+            {
+                "mark": {"type": "line", "color": "#1f77b4", "strokeWidth": 2},
+                "encoding": {"y": {"field": "balance", "type": "quantitative", "title": "Remaining balance (£)"}},
+            },
+        ],
+    }
 
 
-def chart_principal_interest_pie(df: pd.DataFrame, width=300, height=300):
+@functools.lru_cache(maxsize=32)
+def chart_principal_interest_pie(total_principal: float, total_interest: float, width=300, height=300) -> Dict[str, Any]:
     """
     Pie chart (donut) summarising total principal vs total interest paid over the life of the loan.
+    Returns a Vega-Lite spec with the two totals inlined.
+    Cached on its arguments, so treat the returned dict as read-only.
     """
-    total_principal = df["principal"].sum()
-    total_interest = df["interest"].sum()
-    data = pd.DataFrame([
-        {"part": "Principal", "value": total_principal},
-        {"part": "Interest", "value": total_interest},
-    ])
-    chart = alt.Chart(data).mark_arc(innerRadius=40).encode(
-        theta=alt.Theta("value:Q"),
-        color=alt.Color("part:N", scale=alt.Scale(range=["#2ca02c", "#ff7f0e"])),
-        tooltip=["part", alt.Tooltip("value:Q", format=",.2f")]
-    ).properties(width=width, height=height)
-    return chart
+    return {
+        "width": width,
+        "height": height,
+        "data": {"values": [
+            {"part": "Principal", "value": total_principal},
+            {"part": "Interest", "value": total_interest},
+        ]},
+        "mark": {"type": "arc", "innerRadius": 40},
+        "encoding": {
+            "theta": {"field": "value", "type": "quantitative"},
+            "color": {"field": "part", "type": "nominal", "scale": {"range": ["#2ca02c", "#ff7f0e"]}},
+            "tooltip": [
+                {"field": "part", "type": "nominal"},
+                {"field": "value", "type": "quantitative", "format": ",.2f"},
+            ],
+        },
+    }
 
 
-def chart_monthly_principal_interest(df: pd.DataFrame, width=600, height=320):
+@functools.lru_cache(maxsize=8)
+def chart_monthly_principal_interest(width=600, height=320) -> Dict[str, Any]:
     """
     Stacked area chart showing principal vs interest component of monthly payments over time.
+    Returns a Vega-Lite spec; the wide schedule is folded to long form by the Vega runtime.
+    Cached on its arguments, so treat the returned dict as read-only.
     """
-    src = df.melt(id_vars=["month"], value_vars=["principal", "interest"], var_name="component", value_name="amount")
-    chart = alt.Chart(src).mark_area().encode(
-        x=alt.X("month:Q", title="Month"),
-        y=alt.Y("amount:Q", title="Amount (£)"),
-        color=alt.Color("component:N", scale=alt.Scale(range=["#2ca02c", "#ff7f0e"])),
-        tooltip=["month", "component", alt.Tooltip("amount:Q", format=",.2f")]
-    ).properties(width=width, height=height)
-    return chart
+    return {
+        "width": width,
+        "height": height,
+        "transform": [{"fold": ["principal", "interest"], "as": ["component", "amount"]}],
+        "mark": "area",
+        "encoding": {
+            "x": {"field": "month", "type": "quantitative", "title": "Month"},
+            "y": {"field": "amount", "type": "quantitative", "title": "Amount (£)"},
+            "color": {"field": "component", "type": "nominal", "scale": {"range": ["#2ca02c", "#ff7f0e"]}},
+            "tooltip": [
+                {"field": "month", "type": "quantitative"},
+                {"field": "component", "type": "nominal"},
+                {"field": "amount", "type": "quantitative", "format": ",.2f"},
+            ],
+        },
+    }
 
 
-def chart_affordability(parsed: Dict[str, Any], width=480, height=240):
+def chart_affordability(parsed: Dict[str, Any], width=480, height=240) -> Dict[str, Any]:
     """
     Bar chart comparing monthly payment to monthly income and showing a ratio indicator.
+    Returns a Vega-Lite spec with the values inlined.
     """
     monthly = parsed.get("monthly_payment", None) or parsed.get("monthly", None) or 0.0
     income = parsed.get("income", None) or 0.0
     income_monthly = income / 12.0 if income else 0.0
+    return _affordability_spec(monthly, income_monthly, width, height)
+
+
+@functools.lru_cache(maxsize=32)
+def _affordability_spec(monthly: float, income_monthly: float, width: int, height: int) -> Dict[str, Any]:
+    """
+    Vega-Lite spec behind chart_affordability, cached on the scalar inputs (read-only result).
+    """
     ratio = (monthly / income_monthly) if income_monthly else None
 
-    data = pd.DataFrame([
-        {"label": "Monthly payment", "value": monthly},
-        {"label": "Monthly income (available)", "value": income_monthly},
-    ])
-    bars = alt.Chart(data).mark_bar().encode(
-        x=alt.X("label:N", title=""),
-        y=alt.Y("value:Q", title="Amount (£)"),
-        color=alt.Color("label:N", scale=alt.Scale(range=["#1f77b4", "#2ca02c"]))
-    ).properties(width=width, height=height)
+    bars = {
+        "width": width,
+        "height": height,
+        "data": {"values": [
+            {"label": "Monthly payment", "value": monthly},
+            {"label": "Monthly income (available)", "value": income_monthly},
+        ]},
+        "mark": "bar",
+        "encoding": {
+            "x": {"field": "label", "type": "nominal", "title": ""},
+            "y": {"field": "value", "type": "quantitative", "title": "Amount (£)"},
+            "color": {"field": "label", "type": "nominal", "scale": {"range": ["#1f77b4", "#2ca02c"]}},
+        },
+    }
 
     # Add text for ratio if available
     if ratio is not None:
         ratio_text = f"Payment / Income = {ratio:.2f}x"
-        bars = (bars & alt.Chart(pd.DataFrame({"text": [ratio_text]})).mark_text(
-            align="left", baseline="middle", dx=10).encode(text="text:N").properties(width=width, height=30))
+        text = {
+            "width": width,
+            "height": 30,
+            "data": {"values": [{"text": ratio_text}]},
+            "mark": {"type": "text", "align": "left", "baseline": "middle", "dx": 10},
+            "encoding": {"text": {"field": "text", "type": "nominal"}},
+        }
+        return {"vconcat": [bars, text]}
     return bars
 
 
-def chart_risk_donut(lending_metrics: Dict[str, Any], width=300, height=300):
+# Static part of the risk donut; only the three factor values change between renders
+_RISK_DONUT_SPEC: Dict[str, Any] = {
+    "mark": {"type": "arc", "innerRadius": 50},
+    "encoding": {
+        "theta": {"field": "value", "type": "quantitative"},
+        "color": {"field": "factor", "type": "nominal", "scale": {"range": ["#1f77b4", "#ff7f0e", "#d62728"]}},
+        "tooltip": [
+            {"field": "factor", "type": "nominal"},
+            {"field": "value", "type": "quantitative", "format": ".1f"},
+        ],
+    },
+}
+
+
+def chart_risk_donut(lending_metrics: Dict[str, Any], width=300, height=300) -> Dict[str, Any]:
     """
     Donut chart showing risk composition (affordability vs ltv vs flags) by normalized scores.
+    Returns a Vega-Lite spec: the module-level template with this render's values inlined.
+    Cached on the scores, so treat the returned dict as read-only.
     """
-    aff_score = lending_metrics.get("_aff_score", None)
-    ltv_score = lending_metrics.get("_ltv_score", None)
-    flags_score = lending_metrics.get("_flags_score", None)
-
-    # If internal scores not present, fall back to computed components
-    if aff_score is None or ltv_score is None or flags_score is None:
-        # create fallback distribution
-        aff_score = 1 - (lending_metrics.get("ltv", 0) or 0)
-        ltv_score = lending_metrics.get("ltv", 0) or 0
-        flags_score = 1.0 if lending_metrics.get("policy_flags") or lending_metrics.get("bank_red_flags") else 0.0
-
-    total = (aff_score + ltv_score + flags_score) or 1.0
-    data = pd.DataFrame({
-        "factor": ["Affordability", "LTV risk", "Flags"],
-        "value": [aff_score / total * 100, ltv_score / total * 100, flags_score / total * 100]
-    })
-    chart = alt.Chart(data).mark_arc(innerRadius=50).encode(
-        theta=alt.Theta("value:Q"),
-        color=alt.Color("factor:N", scale=alt.Scale(range=["#1f77b4", "#ff7f0e", "#d62728"])),
-        tooltip=["factor", alt.Tooltip("value:Q", format=".1f")]
-    ).properties(width=width, height=height)
-    return chart
+    # Scores derived from LTV and the presence of any flags
+    ltv_score = lending_metrics.get("ltv", 0) or 0
+    aff_score = 1 - ltv_score
+    flags_score = 1.0 if lending_metrics.get("policy_flags") or lending_metrics.get("bank_red_flags") else 0.0
+
+    return _risk_donut_spec(float(aff_score), float(ltv_score), float(flags_score), width, height)
+
+
+_RISK_FACTORS = ("Affordability", "LTV risk", "Flags")
+
+
+@functools.lru_cache(maxsize=32)
+def _risk_donut_spec(aff_score: float, ltv_score: float, flags_score: float, width: int, height: int) -> Dict[str, Any]:
+    """
+    Vega-Lite spec behind chart_risk_donut, cached on the three scores (read-only result).
+    """
+    scores = np.array([aff_score, ltv_score, flags_score])
+    shares = scores / (scores.sum() or 1.0) * 100
+    return {
+        **_RISK_DONUT_SPEC,
+        "width": width,
+        "height": height,
+        "data": {"values": [{"factor": f, "value": v} for f, v in zip(_RISK_FACTORS, shares.tolist())]},
+    }
+
+
+def _fmt_pct(x) -> str:
+    return f"{x:.0%}" if isinstance(x, float) else (x or "N/A")
+
+
+def _fmt_ratio(x) -> str:
+    return f"{x:.2f}" if x is not None else "N/A"
 
 
 def kpi_cards(metrics: Dict[str, Any]):
     """
     Display KPI metric cards (big numbers) using st.columns and st.metric.
     """
-    kpi_cols = st.columns(3)
     try:
         ltv = metrics.get("ltv")
         dscr = metrics.get("dscr")
         risk = metrics.get("risk_score_computed")
+        cat = metrics.get("risk_category", "N/A")
     except Exception:
         ltv = dscr = risk = None
+        cat = "N/A"
 
-    with kpi_cols[0]:
-        st.metric(label="LTV", value=f"{ltv:.0%}" if isinstance(ltv, float) else (ltv or "N/A"))
-    with kpi_cols[1]:
-        st.metric(label="DSCR", value=f"{dscr:.2f}" if dscr is not None else "N/A")
-    with kpi_cols[2]:
-        # present risk score as percent and category
-        cat = metrics.get("risk_category", "N/A")
-        score_str = f"{metrics.get('risk_score_computed', 'N/A'):.0%}" if isinstance(metrics.get("risk_score_computed"), float) else (metrics.get("risk_score_computed") or "N/A")
-        st.metric(label=f"Risk ({cat})", value=score_str)
+    # risk score shown as percent with its category in the label
+    cards = (("LTV", _fmt_pct(ltv)), ("DSCR", _fmt_ratio(dscr)), (f"Risk ({cat})", _fmt_pct(risk)))
+    for col, (label, value) in zip(st.columns(3), cards):
+        col.metric(label=label, value=value)
+
+
+def _report_schedule(parsed: Dict[str, Any], lending_metrics: Dict[str, Any]):
+    """
+    Build the (cached) schedule once per render; returns (df_am, principal_total, interest_total).
+    """
+    loan_amount = parsed.get("loan_amount", 0) or 0
+    term_months = parsed.get("term_months") or lending_metrics.get("term_months") or 360
+    rate = parsed.get("interest_rate_annual") or parsed.get("interest_rate") or lending_metrics.get("interest_rate_annual") or 0.0
+    # ensure decimal form for annual rate
+    if isinstance(rate, (int, float)) and rate > 1:
+        # user may have entered a percent e.g., 5.5 -> convert to 0.055
+        rate = float(rate) / 100.0
+    return _cached_amort(loan_amount, rate or 0.0, int(term_months))
+
+
+def _downsample(df: "pd.DataFrame", max_points: int = 120) -> "pd.DataFrame":
+    """
+    Stride-sample a schedule to at most ~max_points rows, always keeping the final month.
+    """
+    n = len(df)
+    if n <= max_points:
+        return df
+    idx = np.arange(0, n, -(-n // max_points))
+    if idx[-1] != n - 1:
+        idx = np.append(idx, n - 1)
+    return df.iloc[idx]
+
+
+def _render_amortization(df_am: "pd.DataFrame"):
+    # ~120 points is all a 320px chart can show; totals still use the full schedule
+    df_am_plot = _downsample(df_am)
+    # Ship each chart only the columns it encodes; the stacked chart folds principal/interest client-side
+    st.vega_lite_chart(df_am_plot[["month", "balance"]], chart_amortization_balance(), use_container_width=True)
+    st.vega_lite_chart(df_am_plot[["month", "principal", "interest"]], chart_monthly_principal_interest(), use_container_width=True)
+
+
+def _render_composition(totals: Optional[tuple]):
+    st.markdown("### Payment Composition")
+    if totals is not None:
+        st.vega_lite_chart(chart_principal_interest_pie(*totals), use_container_width=True)
+    else:
+        st.info("Principal/Interest chart not available (amortization data missing).")
+
+
+def _render_affordability(parsed: Dict[str, Any]):
+    st.markdown("### Affordability")
+    try:
+        st.vega_lite_chart(chart_affordability(parsed), use_container_width=True)
+    except Exception:
+        st.info("Affordability chart not available.")
+
+
+def _render_risk(lending_metrics: Dict[str, Any]):
+    st.markdown("### Risk Breakdown")
+    try:
+        st.vega_lite_chart(chart_risk_donut(lending_metrics), use_container_width=True)
+        # show explainability reasons
+        reasons = lending_metrics.get("risk_reasons", [])
+        st.write("Reasons:", "; ".join(reasons))
+    except Exception:
+        st.info("Risk chart not available.")
+
+
+def _render_metrics_table(lending_metrics: Dict[str, Any]):
+    st.markdown("### Lending Metrics (detailed)")
+    try:
+        # Plain markdown table: avoids building and Arrow-serialising a DataFrame per rerun
+        lines = ["| metric | value |", "| --- | --- |"]
+        for k, v in lending_metrics.items():
+            if isinstance(v, (dict, list)):
+                continue
+            lines.append(f"| `{k}` | {v} |")
+        st.markdown("\n".join(lines))
+    except Exception:
+        st.info("Detailed metrics not available.")
+
+
+def _render_download(parsed: Dict[str, Any], lending_metrics: Dict[str, Any]):
+    # Download JSON report (parsed + metrics)
+    try:
+        payload = {"parsed": parsed, "lending_metrics": lending_metrics}
+        # Serialised only when the button is clicked, not on every rerun
+        st.download_button("Download full report (JSON)", data=lambda: json_bytes(payload), file_name="underwriting_report.json", mime="application/json")
+    except Exception:
+        pass
 
 
 def render_full_report(parsed: Dict[str, Any], lending_metrics: Dict[str, Any]):
     """
     Render a full professional report section in Streamlit based on parsed data and lending_metrics.
     Call this after compute_lending_metrics(parsed) in your main app flow.
+    The schedule is built once here and shared by every chart that needs it.
     """
     st.markdown("## Professional Report")
     # KPI cards
@@ -173,67 +339,23 @@ def render_full_report(parsed: Dict[str, Any], lending_metrics: Dict[str, Any]):
     # Left: amortization + monthly breakdown; Right: pie + affordability + risk chart
     col1, col2 = st.columns([2, 1])
 
-    # Amortization chart and monthly stacked component
+    totals = None
     with col1:
         st.markdown("### Amortization & Payment Schedule")
-        loan_amount = parsed.get("loan_amount", 0) or 0
-        term_months = parsed.get("term_months") or lending_metrics.get("term_months") or 360
-        rate = parsed.get("interest_rate_annual") or parsed.get("interest_rate") or lending_metrics.get("interest_rate_annual") or 0.0
-        # ensure decimal form for annual rate
-        if isinstance(rate, (int, float)) and rate > 1:
-            # user may have entered a percent e.g., 5.5 -> convert to 0.055
-            rate = float(rate) / 100.0
         try:
-            df_am = amortization_schedule(loan_amount, rate or 0.0, int(term_months))
-            st.altair_chart(chart_amortization_balance(df_am), use_container_width=True)
-            st.altair_chart(chart_monthly_principal_interest(df_am), use_container_width=True)
+            df_am, principal_total, interest_total = _report_schedule(parsed, lending_metrics)
+            totals = (principal_total, interest_total)
+            _render_amortization(df_am)
         except Exception as e:
             st.warning("Could not build amortization schedule: " + str(e))
             # still attempt to show monthly payment if present
             if parsed.get("monthly_payment"):
-                st.write(f"Monthly payment: £{parsed.get('monthly_payment'):,}")
+                st.write(f"Monthly payment: {fmt_gbp(parsed.get('monthly_payment'))}")
 
     with col2:
-        st.markdown("### Payment Composition")
-        try:
-            st.altair_chart(chart_principal_interest_pie(df_am), use_container_width=True)
-        except Exception:
-            st.info("Principal/Interest chart not available (amortization data missing).")
+        _render_composition(totals)
+        _render_affordability(parsed)
+        _render_risk(lending_metrics)
 
-        st.markdown("### Affordability")
-        try:
-            st.altair_chart(chart_affordability(parsed), use_container_width=True)
-        except Exception:
-            st.info("Affordability chart not available.")
-
-        st.markdown("### Risk Breakdown")
-        try:
-            st.altair_chart(chart_risk_donut(lending_metrics), use_container_width=True)
-            # show explainability reasons
-            reasons = lending_metrics.get("risk_reasons", [])
-            st.write("Reasons:", "; ".join(reasons))
-        except Exception:
-            st.info("Risk chart not available.")
-
-    # Full metrics table
-    st.markdown("### Lending Metrics (detailed)")
-    try:
-        rows = []
-        for k, v in lending_metrics.items():
-            if isinstance(v, (dict, list)):
-                continue
-            rows.append({"metric": k, "value": v})
-        dfm = pd.DataFrame(rows)
-        st.table(dfm)
-    except Exception:
-        st.info("Detailed metrics not available.")
-
-    # Download JSON report (parsed + metrics)
-    try:
-        buf = io.BytesIO()
-        payload = {"parsed": parsed, "lending_metrics": lending_metrics}
-        buf.write(io.BytesIO(str(payload).encode("utf-8")).getvalue())
-        buf.seek(0)
-        st.download_button("Download full report (JSON)", data=buf, file_name="underwriting_report.json", mime="application/json")
-    except Exception:
-        pass
+    _render_metrics_table(lending_metrics)
+    _render_download(parsed, lending_metrics)
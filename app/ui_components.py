@@ -1,5 +1,6 @@
 import streamlit as st
 import os
+from pathlib import Path
 
 def two_column_form():
     return st.columns(2)
@@ -7,15 +8,25 @@ def two_column_form():
 def small_info(msg):
     st.info(msg)
 
+@st.cache_data(max_entries=64, show_spinner=False)
+def read_file_bytes(path, mtime):
+    """File contents cached on (path, mtime), so repeat downloads come from memory until the file changes."""
+    return Path(path).read_bytes()
+
+def deferred_file_bytes(path):
+    """Callable for st.download_button(data=...): reads (via the cache) only when the user clicks."""
+    return lambda: read_file_bytes(str(path), os.path.getmtime(path))
+
 def pdf_download_button_from_path(path, label="Download PDF"):
     """
     Helper: show a download button for a PDF at filesystem path (if readable).
     Return True on success, False if file couldn't be opened.
     """
+    if not os.access(path, os.R_OK):
+        return False
     try:
-        with open(path, "rb") as f:
-            pdf_bytes = f.read()
-        st.download_button(label=label, data=pdf_bytes, file_name=os.path.basename(path), mime="application/pdf")
+        # Deferred, cached read: the file is only loaded when the user clicks
+        st.download_button(label=label, data=deferred_file_bytes(path), file_name=os.path.basename(path), mime="application/pdf")
         return True
     except Exception:
         return False
@@ -1,8 +1,59 @@
+import hashlib
 import os
+import shutil
+import tempfile
+
+# Uploads are copied/hashed in 64 KB chunks instead of materialising getbuffer() copies
+_CHUNK = 64 * 1024
+
+def file_digest(uploaded_file) -> str:
+    """SHA-256 hex digest of an uploaded file, read in chunks; leaves the file at position 0."""
+    h = hashlib.sha256()
+    uploaded_file.seek(0)
+    for chunk in iter(lambda: uploaded_file.read(_CHUNK), b""):
+        h.update(chunk)
+    uploaded_file.seek(0)
+    return h.hexdigest()
+
+def copy_upload(uploaded_file, dest) -> str:
+    """Stream an uploaded file to dest in chunks; returns dest as a string."""
+    uploaded_file.seek(0)
+    with open(dest, "wb") as f:
+        shutil.copyfileobj(uploaded_file, f, length=_CHUNK)
+    return str(dest)
+
+def store_upload(uploaded_file, dest, digest: str, cas_dir) -> str:
+    """
+    Content-addressed save: bytes live once under cas_dir/<digest[:2]>/<digest> and dest is a hard
+    link to them, so re-uploading the same file only costs the hash pass.
+    """
+    cas_path = os.path.join(cas_dir, digest[:2], digest)
+    if not os.path.exists(cas_path):
+        os.makedirs(os.path.dirname(cas_path), exist_ok=True)
+        # write beside the blob then rename, so a crash or a concurrent upload never leaves a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cas_path), suffix=".part")
+        os.close(fd)
+        try:
+            copy_upload(uploaded_file, tmp_path)
+            os.replace(tmp_path, cas_path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+    # unlink straight away rather than stat-then-unlink; a missing dest is the common case
+    try:
+        os.remove(dest)
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(cas_path, dest)
+    except OSError:
+        # no hard links here (e.g. different filesystem): fall back to a copy
+        shutil.copyfile(cas_path, dest)
+    return str(dest)
 
 def save_uploaded_file(uploaded_file, dest_dir="output/generated_pdfs"):
     os.makedirs(dest_dir, exist_ok=True)
-    dest = os.path.join(dest_dir, uploaded_file.name)
-    with open(dest, "wb") as f:
-        f.write(uploaded_file.getbuffer())
-    return dest
+    return copy_upload(uploaded_file, os.path.join(dest_dir, uploaded_file.name))
@@ -1,4 +1,74 @@
-from pipeline.llm.summarizer import answer_question
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+# Answers keyed on (application hash, normalised question); repeats skip the LLM call
+_ANSWER_CACHE_MAX = 256
+_answer_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+_answer_lock = threading.Lock()
+_NON_WORD_RE = re.compile(r"[^\w]+")
+
+# Questions answered straight from the parsed data, without loading the LLM client
+_WHY_FLAG_RE = re.compile(r"\bwhy\b.*\bflag|\bflag(?:s|ged)?\b.*\bwhy\b", re.IGNORECASE)
+_BRIDGE_RE = re.compile(r"\bbridg(?:e|ing)\b.*\bsuit|\bsuit.*\bbridg(?:e|ing)\b", re.IGNORECASE)
+
+def _all_flags(parsed: dict) -> list:
+    lm = parsed.get("lending_metrics") or {}
+    flags = []
+    for source in (parsed.get("policy_flags"), lm.get("policy_flags"), parsed.get("bank_red_flags")):
+        for f in source or []:
+            if f not in flags:
+                flags.append(f)
+    return flags
+
+def _deterministic_answer(parsed: dict, question: str) -> Optional[str]:
+    if _WHY_FLAG_RE.search(question):
+        flags = _all_flags(parsed)
+        if not flags:
+            return "No policy or bank red flags were raised for this application."
+        return "Flagged for: " + "; ".join(flags) + "."
+    if _BRIDGE_RE.search(question):
+        flags = _all_flags(parsed)
+        if not flags:
+            return "No automated flags: suitable for bridging consideration, subject to underwriting."
+        return "Not suitable for bridging without manual review: " + "; ".join(flags) + "."
+    return None
+
+def _cache_key(parsed: dict, question: str) -> Tuple[str, str]:
+    parsed_hash = hashlib.sha1(json.dumps(parsed, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    # Case, punctuation and spacing don't change the question ("What's the LTV?" == "whats the ltv")
+    q_norm = _NON_WORD_RE.sub(" ", question.lower().replace("'", "")).strip()
+    return parsed_hash, q_norm
+
+def _cached_answer(key: Tuple[str, str]) -> Optional[str]:
+    with _answer_lock:
+        answer = _answer_cache.get(key)
+        if answer is not None:
+            _answer_cache.move_to_end(key)
+        return answer
+
+def _store_answer(key: Tuple[str, str], answer: str) -> None:
+    if not answer:
+        return
+    with _answer_lock:
+        _answer_cache[key] = answer
+        _answer_cache.move_to_end(key)
+        if len(_answer_cache) > _ANSWER_CACHE_MAX:
+            _answer_cache.popitem(last=False)
 
 def ask(parsed: dict, question: str) -> str:
-    return answer_question(parsed, question)
+    answer = _deterministic_answer(parsed, question)
+    if answer is not None:
+        return answer
+    key = _cache_key(parsed, question)
+    answer = _cached_answer(key)
+    if answer is None:
+        from pipeline.llm.summarizer import _answer_question
+        answer, from_llm = _answer_question(parsed, question)
+        # Errors and the heuristic fallback (missing key, network) are transient: don't pin them
+        if from_llm:
+            _store_answer(key, answer)
+    return answer
@@ -1,10 +1,22 @@
 import os
+import re
 import json
-from typing import Optional
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
 
 # Default model name (override via environment or Streamlit secrets)
 OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-4")
 
+# Keyword intents for the offline answer_question fallback, matched in one scan
+_FALLBACK_INTENT_RE = re.compile(r"(?P<ltv>ltv)|(?P<income>income)", re.IGNORECASE)
+
+# Summaries keyed on a hash of the prompt: re-analysing the same application skips the LLM call
+_SUMMARY_CACHE_MAX = 64
+_summary_cache: "OrderedDict[str, str]" = OrderedDict()
+_summary_lock = threading.Lock()
+
 # Lazy client placeholders
 _openai_client = None
 _use_new_client = False
@@ -63,6 +75,16 @@ def _ensure_client():
         _use_new_client = False
         return
 
+def prepare_client() -> None:
+    """
+    Initialise the LLM client ahead of the first call (imports the openai package).
+    Never raises, so it can run on a worker thread while other work proceeds.
+    """
+    try:
+        _ensure_client()
+    except Exception:
+        pass
+
 def _call_chat_completion(messages, max_tokens=350):
     """
     Unified helper that calls chat completions for either the new OpenAI client or
@@ -105,11 +127,22 @@ def generate_prompt(parsed: dict) -> str:
 
 def generate_summary(parsed: dict) -> str:
     prompt = generate_prompt(parsed)
+    key = hashlib.sha1(prompt.encode("utf-8")).hexdigest()
+    with _summary_lock:
+        text = _summary_cache.get(key)
+        if text is not None:
+            _summary_cache.move_to_end(key)
+            return text
 
     # Attempt LLM call if a key/client is available
     try:
         messages = [{"role": "user", "content": prompt}]
         text = _call_chat_completion(messages, max_tokens=350)
+        # Only real summaries are kept; errors below are returned uncached
+        with _summary_lock:
+            _summary_cache[key] = text
+            if len(_summary_cache) > _SUMMARY_CACHE_MAX:
+                _summary_cache.popitem(last=False)
         return text
     except RuntimeError as e:
         # Friendly sanitized message for invalid/missing key
@@ -138,18 +171,28 @@ def generate_summary(parsed: dict) -> str:
     )
     return summary
 
-def answer_question(parsed: dict, question: str) -> str:
+def _fallback_answer(parsed: dict, question: str, err: Exception) -> str:
+    # Simple heuristic fallback for common queries
+    intents = {m.lastgroup for m in _FALLBACK_INTENT_RE.finditer(question)}
+    if "ltv" in intents:
+        return f"LTV: {parsed.get('ltv', 'N/A')}"
+    if "income" in intents:
+        return f"Income: {parsed.get('income', 'N/A')}"
+    return f"LLM_ERROR: {err}"
+
+def _answer_question(parsed: dict, question: str) -> Tuple[str, bool]:
+    """
+    Answer text plus whether it came from the model. Error text and the
+    heuristic fallback are flagged False so callers don't cache them.
+    """
     prompt = f"Context:\n{json.dumps(parsed, indent=2)}\n\nQuestion: {question}\nAnswer concisely."
     try:
         messages = [{"role": "user", "content": prompt}]
-        return _call_chat_completion(messages, max_tokens=200)
+        return _call_chat_completion(messages, max_tokens=200), True
     except RuntimeError as e:
-        return f"LLM_ERROR: {e}"
+        return f"LLM_ERROR: {e}", False
     except Exception as e:
-        # Simple heuristic fallback for common queries
-        q = question.lower()
-        if "ltv" in q:
-            return f"LTV: {parsed.get('ltv', 'N/A')}"
-        if "income" in q:
-            return f"Income: {parsed.get('income', 'N/A')}"
-        return f"LLM_ERROR: {e}"
+        return _fallback_answer(parsed, question, e), False
+
+def answer_question(parsed: dict, question: str) -> str:
+    return _answer_question(parsed, question)[0]
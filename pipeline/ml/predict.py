@@ -1,12 +1,20 @@
+import functools
 import os
 import joblib
 
 MODEL_PATH = "pipeline/ml/model.pkl"
 
+@functools.lru_cache(maxsize=1)
+def _load_model_at(mtime_ns: int):
+    return joblib.load(MODEL_PATH)
+
 def _load_model():
-    if os.path.exists(MODEL_PATH):
-        return joblib.load(MODEL_PATH)
-    return None
+    # Unpickle once per process; a retrained model.pkl (new mtime) is picked up on the next call
+    try:
+        mtime_ns = os.stat(MODEL_PATH).st_mtime_ns
+    except OSError:
+        return None
+    return _load_model_at(mtime_ns)
 
 def predict_risk(parsed: dict) -> float:
     model = _load_model()
@@ -1,39 +1,68 @@
+import functools
 import os
-from pipeline.extractor.pdf_to_text import extract_text_from_pdf
+from concurrent.futures import ThreadPoolExecutor
 from pipeline.extractor.field_parser import parse_fields_from_text
-from pipeline.ml.predict import predict_risk
 from pipeline.rules.policy_rules import evaluate_policy_rules
-from pipeline.llm.summarizer import generate_summary
 from utils.file_utils import save_json
 
+_LAZY_STAGES = ("extract_text_from_pdf", "predict_risk", "generate_summary")
+
+@functools.lru_cache(maxsize=1)
+def _load_stages():
+    """
+    Import the heavy stages (PyMuPDF/pdfplumber/pytesseract, joblib, OpenAI) on first use only,
+    so Q&A callers don't pay for them; cached for the life of the process.
+    """
+    from pipeline.extractor.pdf_to_text import extract_text_from_pdf
+    from pipeline.ml.predict import predict_risk
+    from pipeline.llm.summarizer import generate_summary, prepare_client
+    return extract_text_from_pdf, predict_risk, generate_summary, prepare_client
+
+@functools.lru_cache(maxsize=1)
+def _load_qna():
+    from pipeline.llm.qna import ask as llm_ask
+    return llm_ask
+
+def __getattr__(name):
+    # Keep `from pipeline.pipeline import extract_text_from_pdf` etc. working without eager imports
+    if name in _LAZY_STAGES:
+        return _load_stages()[_LAZY_STAGES.index(name)]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 def process_pdf(pdf_path: str) -> dict:
     """
     Orchestrates extraction -> parsing -> ML -> rules -> LLM summarisation.
     """
-    text = extract_text_from_pdf(pdf_path)
-    parsed = parse_fields_from_text(text)
+    extract_text_from_pdf, predict_risk, generate_summary, prepare_client = _load_stages()
+    # The summary needs the risk score and flags, but the LLM client setup (openai import) doesn't:
+    # overlap it with extraction/OCR and scoring
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        client_ready = pool.submit(prepare_client)
+
+        text = extract_text_from_pdf(pdf_path)
+        parsed = parse_fields_from_text(text)
+
+        if parsed.get("ltv") is None:
+            try:
+                parsed["ltv"] = parsed["loan_amount"] / parsed["property_value"]
+            except Exception:
+                parsed["ltv"] = None
 
-    if parsed.get("ltv") is None:
-        try:
-            parsed["ltv"] = parsed["loan_amount"] / parsed["property_value"]
-        except Exception:
-            parsed["ltv"] = None
+        risk = predict_risk(parsed)
+        parsed["risk_score"] = risk
 
-    risk = predict_risk(parsed)
-    parsed["risk_score"] = risk
+        flags = evaluate_policy_rules(parsed)
+        parsed["policy_flags"] = flags
 
-    flags = evaluate_policy_rules(parsed)
-    parsed["policy_flags"] = flags
+        client_ready.result()
 
     summary = generate_summary(parsed)
     parsed["summary"] = summary
 
-    os.makedirs("output/analysis_reports", exist_ok=True)
     save_json(parsed, os.path.join("output/analysis_reports", os.path.basename(pdf_path) + ".analysis.json"))
     return parsed
 
 def process_data(structured: dict, ask: str = None) -> str:
     if ask:
-        from pipeline.llm.qna import ask as llm_ask
-        return llm_ask(structured, ask)
+        return _load_qna()(structured, ask)
     return structured.get("summary", "")
@@ -1,10 +1,42 @@
+import hashlib
 import json
 import os
+import threading
+from collections import OrderedDict
+
+# path -> digest of the JSON last written there by this process, so unchanged results aren't rewritten.
+# Shared by every session, so it is an LRU: a forgotten path just falls back to the on-disk comparison
+_LAST_WRITTEN_MAX = 256
+_last_written: "OrderedDict[str, bytes]" = OrderedDict()
+_last_written_lock = threading.Lock()
+
+def _same_content(path, raw):
+    # Cheap size check first; only a same-sized file is read back and compared
+    try:
+        if os.path.getsize(path) != len(raw):
+            return False
+        with open(path, "rb") as f:
+            return f.read() == raw
+    except OSError:
+        return False
 
 def save_json(data, path):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    raw = json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+    digest = hashlib.blake2b(raw, digest_size=16).digest()
+    with _last_written_lock:
+        unchanged = _last_written.get(path) == digest
+    if unchanged and os.path.exists(path):
+        return path
+    # Not written by this process yet (e.g. after a restart): skip if the file on disk already matches
+    if not _same_content(path, raw):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(raw)
+    with _last_written_lock:
+        _last_written[path] = digest
+        _last_written.move_to_end(path)
+        if len(_last_written) > _LAST_WRITTEN_MAX:
+            _last_written.popitem(last=False)
     return path
 
 def load_json(path):